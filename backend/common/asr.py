@@ -0,0 +1,503 @@
+import os
+import sys
+import json
+import math
+import time
+import struct
+import shutil
+import asyncio
+import importlib
+import importlib.util
+from array import array
+from concurrent.futures import BrokenExecutor
+from typing import TYPE_CHECKING, AsyncGenerator, AsyncIterator, Dict, Any, Optional, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+# Get environment variables
+ASR_ENGINE = os.getenv("ASR_ENGINE", "")  # "whisper", "package.module:ClassName", or "stub" for tests; unset disables /transcribe
+ASR_MODEL = os.getenv("ASR_MODEL", "base.en")
+ASR_WORKERS = int(os.getenv("ASR_WORKERS", "2"))
+ASR_MAX_CONCURRENCY = int(os.getenv("ASR_MAX_CONCURRENCY", "4"))  # Audio windows in flight across all requests
+ASR_WINDOW_SECONDS = float(os.getenv("ASR_WINDOW_SECONDS", "5"))
+ASR_PRELOAD = os.getenv("ASR_PRELOAD", "1") == "1"  # Start workers and load the engine in the background at startup
+ASR_DEFAULT_SAMPLE_RATE = 16000
+
+# Content types carrying headerless signed 16-bit little-endian PCM
+_RAW_PCM_TYPES = {"audio/l16", "audio/pcm", "audio/x-raw", "application/octet-stream"}
+_WAV_TYPES = {"audio/wav", "audio/x-wav", "audio/wave", "audio/vnd.wave"}
+
+_executor: Optional["ProcessPoolExecutor"] = None
+_state = "idle"  # idle, loading, ready or failed
+_error: Optional[str] = None
+_window_slots = asyncio.Semaphore(ASR_MAX_CONCURRENCY)
+_stats = {
+    "requests": 0,
+    "windows": 0,
+    "audio_seconds": 0.0,
+    "processing_seconds": 0.0,
+    "queue_latency_total": 0.0,
+    "queue_latency_max": 0.0,
+}
+
+
+class TranscriptionUnavailable(RuntimeError):
+    """The configured engine cannot run: unknown, missing dependencies, or its workers crashed."""
+
+
+class StubEngine:
+    """Deterministic engine that reports where speech-like energy was found."""
+
+    requires = ()
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def transcribe(self, samples: array, sample_rate: int) -> str:
+        if not samples:
+            return ""
+        rms = math.sqrt(sum(s * s for s in samples) / len(samples))
+        if rms < 500:
+            return ""
+        return f"[speech {len(samples) / sample_rate:.2f}s]"
+
+
+class WhisperEngine:
+    """Local CPU engine backed by faster-whisper."""
+
+    requires = ("numpy", "faster_whisper")
+
+    def __init__(self, model: str):
+        import numpy
+        from faster_whisper import WhisperModel
+
+        self._np = numpy
+        self._model = WhisperModel(model, device="cpu", compute_type="int8")
+
+    def transcribe(self, samples: array, sample_rate: int) -> str:
+        np = self._np
+        audio = np.frombuffer(samples, dtype=np.int16).astype(np.float32) / 32768.0
+        if sample_rate != 16000:
+            # Whisper expects 16 kHz input; linear interpolation is enough for speech
+            target = np.linspace(0, len(audio) - 1, int(len(audio) * 16000 / sample_rate))
+            audio = np.interp(target, np.arange(len(audio)), audio).astype(np.float32)
+        segments, _ = self._model.transcribe(audio, beam_size=1, vad_filter=True)
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+_ENGINES = {"stub": StubEngine, "whisper": WhisperEngine}
+
+# Engine instance owned by each worker process
+_worker_engine = None
+
+
+def _engine_class(spec: str):
+    """Resolve a registered engine name or a "package.module:ClassName" path."""
+    if spec in _ENGINES:
+        return _ENGINES[spec]
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise TranscriptionUnavailable(f"Unknown ASR engine: {spec}")
+    try:
+        return getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError) as e:
+        raise TranscriptionUnavailable(f"Cannot load ASR engine {spec}: {e}")
+
+
+def check_engine(spec: str):
+    """
+    Check in the server process that an engine can be loaded, before workers try to.
+
+    Raises:
+        TranscriptionUnavailable: If no engine is configured, it is unknown, or its packages are not installed
+    """
+    if not spec:
+        raise TranscriptionUnavailable("Transcription is not configured; set ASR_ENGINE (e.g. whisper)")
+    missing = [name for name in getattr(_engine_class(spec), "requires", ()) if importlib.util.find_spec(name) is None]
+    if missing:
+        raise TranscriptionUnavailable(f"ASR engine {spec} needs missing packages: {', '.join(missing)}")
+
+
+def _init_worker(spec: str):
+    """Load the engine once per worker so model load time is not paid per window."""
+    global _worker_engine
+    _worker_engine = _engine_class(spec)(ASR_MODEL)
+
+
+def _recognize_window(pcm: bytes, sample_rate: int, channels: int, ready_at: float) -> Dict[str, Any]:
+    """Decode one window of PCM audio and run recognition on it. Runs in a worker process."""
+    started = time.time()
+    samples = array("h")
+    samples.frombytes(pcm[:len(pcm) - len(pcm) % (2 * channels)])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    if channels > 1:
+        samples = array("h", (sum(samples[i:i + channels]) // channels for i in range(0, len(samples), channels)))
+    text = _worker_engine.transcribe(samples, sample_rate)
+    return {
+        "text": text,
+        "queue_latency": started - ready_at,
+        "processing_time": time.time() - started,
+    }
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _get_executor() -> "ProcessPoolExecutor":
+    global _executor
+    if _executor is None:
+        check_engine(ASR_ENGINE)
+        # Imported here so servers that never transcribe do not pay for it at startup
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        _executor = ProcessPoolExecutor(
+            max_workers=ASR_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(ASR_ENGINE,),
+        )
+    return _executor
+
+
+def _discard_executor(executor: "ProcessPoolExecutor"):
+    """Drop a pool whose workers died so the next request starts a fresh one."""
+    global _executor, _state, _error
+    if _executor is executor:
+        _executor = None
+        _state, _error = "failed", "ASR workers crashed"
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _mark_ready(executor: "ProcessPoolExecutor"):
+    """A pool that has recognized a window has its engine loaded, e.g. after replacing a crashed one."""
+    global _state, _error
+    if _executor is executor:
+        _state, _error = "ready", None
+
+
+async def preload_asr():
+    """Start every worker and load the engine in it, so the first upload is not a cold start."""
+    global _state, _error
+    if not ASR_PRELOAD or not ASR_ENGINE:
+        return
+    loop = asyncio.get_running_loop()
+    _state = "loading"
+    try:
+        executor = _get_executor()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(executor, _ping) for _ in range(ASR_WORKERS)))
+        except BrokenExecutor:
+            _discard_executor(executor)
+            raise TranscriptionUnavailable(f"ASR workers crashed while loading engine {ASR_ENGINE}")
+        _state, _error = "ready", None
+    except TranscriptionUnavailable as e:
+        _state, _error = "failed", str(e)
+        print(f"ASR preload failed: {e}")
+
+
+def asr_ready() -> bool:
+    """Whether the transcription workers are up and have loaded the engine."""
+    return _state == "ready" or not ASR_PRELOAD or not ASR_ENGINE
+
+
+def asr_status() -> Dict[str, Any]:
+    """
+    Get the transcription component's state for readiness checks.
+
+    Returns:
+        Dictionary with "state" (disabled, lazy, loading, ready or failed), the last "error",
+        and "pending", which is only True while the engine is still loading
+    """
+    if not ASR_ENGINE:
+        state = "disabled"
+    elif _state == "idle":
+        state = "loading" if ASR_PRELOAD else "lazy"
+    else:
+        state = _state
+    return {"state": state, "error": _error, "pending": state == "loading"}
+
+
+def shutdown_asr():
+    """Stop the recognition worker pool."""
+    global _executor, _state, _error
+    _state, _error = "idle", None
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def get_asr_stats() -> Dict[str, Any]:
+    """
+    Get aggregate transcription metrics since startup.
+
+    Returns:
+        Dictionary with totals, real-time factor and queue latency figures
+    """
+    windows = _stats["windows"]
+    audio_seconds = _stats["audio_seconds"]
+    return {
+        "engine": ASR_ENGINE,
+        "workers": ASR_WORKERS,
+        "max_concurrency": ASR_MAX_CONCURRENCY,
+        "requests": _stats["requests"],
+        "windows": windows,
+        "audio_seconds": round(audio_seconds, 3),
+        "real_time_factor": round(_stats["processing_seconds"] / audio_seconds, 4) if audio_seconds else None,
+        "avg_queue_latency": round(_stats["queue_latency_total"] / windows, 4) if windows else None,
+        "max_queue_latency": round(_stats["queue_latency_max"], 4),
+    }
+
+
+def _parse_content_type(content_type: str) -> Tuple[str, Dict[str, str]]:
+    media_type, *params = [part.strip() for part in content_type.split(";")]
+    options = {}
+    for param in params:
+        key, _, value = param.partition("=")
+        options[key.strip().lower()] = value.strip().strip('"')
+    return media_type.lower(), options
+
+
+def _parse_wav_header(buf: bytes) -> Optional[Tuple[int, int, int]]:
+    """
+    Parse a RIFF/WAVE header.
+
+    Returns:
+        (sample_rate, channels, data_offset), or None if more bytes are needed
+    """
+    if len(buf) < 12:
+        return None
+    if buf[:4] != b"RIFF" or buf[8:12] != b"WAVE":
+        raise ValueError("Invalid WAV header")
+    offset = 12
+    fmt = None
+    while len(buf) >= offset + 8:
+        chunk_id, size = struct.unpack("<4sI", buf[offset:offset + 8])
+        if chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            return fmt[0], fmt[1], offset + 8
+        if len(buf) < offset + 8 + size:
+            return None
+        if chunk_id == b"fmt ":
+            audio_format, channels, sample_rate = struct.unpack("<HHI", buf[offset + 8:offset + 16])
+            bits = struct.unpack("<H", buf[offset + 22:offset + 24])[0]
+            if audio_format != 1 or bits != 16:
+                raise ValueError("Only 16-bit PCM WAV audio is supported")
+            fmt = (sample_rate, channels)
+        offset += 8 + size + size % 2
+    return None
+
+
+async def _wav_pcm(chunks: AsyncIterator[bytes], fmt: Dict[str, int]) -> AsyncGenerator[bytes, None]:
+    """Strip the WAV header from the stream, filling in fmt once it is known."""
+    header = b""
+    async for chunk in chunks:
+        if "sample_rate" in fmt:
+            yield chunk
+            continue
+        header += chunk
+        parsed = _parse_wav_header(header)
+        if parsed:
+            fmt["sample_rate"], fmt["channels"], data_offset = parsed
+            yield header[data_offset:]
+    if "sample_rate" not in fmt:
+        raise ValueError("Incomplete WAV header")
+
+
+async def _ffmpeg_pcm(chunks: AsyncIterator[bytes]) -> AsyncGenerator[bytes, None]:
+    """Decode compressed audio (webm, ogg, mp3, ...) to 16 kHz mono PCM as it arrives."""
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-loglevel", "error", "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-ar", str(ASR_DEFAULT_SAMPLE_RATE), "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+
+    async def feed():
+        try:
+            async for chunk in chunks:
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg gave up on the input; its exit status below reports why
+            pass
+        finally:
+            process.stdin.close()
+
+    feeder = asyncio.create_task(feed())
+    try:
+        while True:
+            data = await process.stdout.read(65536)
+            if not data:
+                break
+            yield data
+        await feeder
+        if await process.wait() != 0:
+            raise ValueError("Failed to decode audio")
+    finally:
+        feeder.cancel()
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+
+def transcribe_stream(
+    chunks: AsyncIterator[bytes],
+    content_type: str,
+    sample_rate: Optional[int] = None,
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Transcribe streamed audio, emitting partial transcripts while audio is still arriving.
+
+    Args:
+        chunks: Audio bytes as they arrive, e.g. Request.stream()
+        content_type: Content type of the upload; raw PCM, WAV, or anything ffmpeg can decode
+        sample_rate: Sample rate of raw PCM uploads, if not given as a content type "rate" parameter
+
+    Returns:
+        AsyncGenerator yielding a partial event per audio window and a final event with metrics
+
+    Raises:
+        ValueError: If the content type is not supported
+        TranscriptionUnavailable: If the configured engine cannot be loaded
+    """
+    check_engine(ASR_ENGINE)
+    media_type, options = _parse_content_type(content_type)
+    fmt: Dict[str, int] = {}
+    if media_type in _RAW_PCM_TYPES:
+        fmt["sample_rate"] = int(options.get("rate") or sample_rate or ASR_DEFAULT_SAMPLE_RATE)
+        fmt["channels"] = int(options.get("channels", 1))
+        pcm = chunks
+    elif media_type in _WAV_TYPES:
+        pcm = _wav_pcm(chunks, fmt)
+    elif media_type.startswith("audio/") or media_type.startswith("video/"):
+        if shutil.which("ffmpeg") is None:
+            raise ValueError(f"Decoding {media_type} requires ffmpeg")
+        fmt["sample_rate"], fmt["channels"] = ASR_DEFAULT_SAMPLE_RATE, 1
+        pcm = _ffmpeg_pcm(chunks)
+    else:
+        raise ValueError(f"Unsupported audio content type: {media_type or 'none'}")
+    return _run_pipeline(pcm, fmt)
+
+
+async def _run_pipeline(pcm: AsyncIterator[bytes], fmt: Dict[str, int]) -> AsyncGenerator[Dict[str, Any], None]:
+    loop = asyncio.get_running_loop()
+    pending: asyncio.Queue = asyncio.Queue()
+    request_started = time.time()
+
+    async def submit(window: bytes, start: float):
+        # Time spent waiting for a slot counts towards queue latency
+        ready_at = time.time()
+        await _window_slots.acquire()
+        try:
+            executor = _get_executor()
+            future = loop.run_in_executor(
+                executor, _recognize_window,
+                window, fmt["sample_rate"], fmt["channels"], ready_at,
+            )
+        except BrokenExecutor:
+            _window_slots.release()
+            _discard_executor(executor)
+            raise TranscriptionUnavailable("ASR workers crashed; check ASR_ENGINE and its dependencies")
+        except BaseException:
+            _window_slots.release()
+            raise
+        future.add_done_callback(lambda _: _window_slots.release())
+        duration = len(window) / (2 * fmt["channels"] * fmt["sample_rate"])
+        await pending.put((start, duration, executor, future))
+        return start + duration
+
+    async def produce():
+        buf = bytearray()
+        position = 0.0
+        window_bytes = 0
+        try:
+            async for data in pcm:
+                buf += data
+                if not window_bytes:
+                    frame = 2 * fmt["channels"]
+                    window_bytes = max(frame, int(ASR_WINDOW_SECONDS * fmt["sample_rate"]) * frame)
+                while len(buf) >= window_bytes:
+                    position = await submit(bytes(buf[:window_bytes]), position)
+                    del buf[:window_bytes]
+            if buf and window_bytes:
+                position = await submit(bytes(buf), position)
+        finally:
+            if hasattr(pcm, "aclose"):
+                await pcm.aclose()
+            await pending.put(None)
+
+    producer = asyncio.create_task(produce())
+    transcript = []
+    windows = 0
+    audio_seconds = processing_seconds = queue_total = queue_max = 0.0
+    _stats["requests"] += 1
+    try:
+        while True:
+            item = await pending.get()
+            if item is None:
+                break
+            start, duration, executor, future = item
+            try:
+                result = await future
+            except BrokenExecutor:
+                _discard_executor(executor)
+                raise TranscriptionUnavailable("ASR workers crashed; check ASR_ENGINE and its dependencies")
+            _mark_ready(executor)
+            windows += 1
+            audio_seconds += duration
+            processing_seconds += result["processing_time"]
+            queue_total += result["queue_latency"]
+            queue_max = max(queue_max, result["queue_latency"])
+            _stats["windows"] += 1
+            _stats["audio_seconds"] += duration
+            _stats["processing_seconds"] += result["processing_time"]
+            _stats["queue_latency_total"] += result["queue_latency"]
+            _stats["queue_latency_max"] = max(_stats["queue_latency_max"], result["queue_latency"])
+            if result["text"]:
+                transcript.append(result["text"])
+            yield {
+                "partial": True,
+                "text": result["text"],
+                "transcript": " ".join(transcript),
+                "start": round(start, 3),
+                "end": round(start + duration, 3),
+                "real_time_factor": round(result["processing_time"] / duration, 4) if duration else None,
+                "queue_latency": round(result["queue_latency"], 4),
+            }
+        # Surface errors raised while reading or decoding the upload
+        await producer
+        yield {
+            "partial": False,
+            "text": " ".join(transcript),
+            "metrics": {
+                "windows": windows,
+                "audio_seconds": round(audio_seconds, 3),
+                "processing_seconds": round(processing_seconds, 3),
+                "real_time_factor": round(processing_seconds / audio_seconds, 4) if audio_seconds else None,
+                "avg_queue_latency": round(queue_total / windows, 4) if windows else None,
+                "max_queue_latency": round(queue_max, 4),
+                "wall_seconds": round(time.time() - request_started, 3),
+            },
+        }
+    finally:
+        producer.cancel()
+        while not pending.empty():
+            item = pending.get_nowait()
+            if item is not None:
+                item[3].cancel()
+
+
+async def transcription_events(events: AsyncGenerator[Dict[str, Any], None]) -> AsyncGenerator[str, None]:
+    """Format transcription events as server-sent events."""
+    try:
+        async for event in events:
+            yield f"data: {json.dumps(event)}\n\n"
+    except (ValueError, TranscriptionUnavailable) as e:
+        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+    yield "data: [DONE]\n\n"
@@ -0,0 +1,19 @@
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for endpoints that keep reading the request body while they respond.
+    
+    Starlette's StreamingResponse (before ASGI spec 2.4 support) watches for disconnects by
+    calling receive() itself, which swallows body chunks that request.stream() is still waiting
+    for. Here the body reader owns the receive channel; request.stream() raises ClientDisconnect
+    if the client goes away, which ends the response the same way.
+    """
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        
+        if self.background is not None:
+            await self.background()
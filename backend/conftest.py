@@ -0,0 +1 @@
+# Lets tests import common, local and online the same way the servers do when run from backend/
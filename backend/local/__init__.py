@@ -0,0 +1 @@
+# F.R.I.D.A.Y local backend (Ollama)
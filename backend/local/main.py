@@ -1,20 +1,34 @@
 from fastapi import FastAPI, Request, Response, BackgroundTasks, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse
 import httpx
 import os
 import json
-import sys
+import time
 import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 
-# Add common directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from common.tts import text_to_speech
 from common.rag import get_rag_context
+from common.responses import UploadStreamingResponse
+from common.asr import (
+    TranscriptionUnavailable, transcribe_stream, transcription_events, get_asr_stats, preload_asr, asr_status, shutdown_asr
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the Ollama model and transcription workers in the background while serving requests."""
+    tasks = [asyncio.create_task(keep_warm_scheduler()), asyncio.create_task(preload_asr())]
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    shutdown_asr()
 
-app = FastAPI(title="DeepSeek HUD Agent - Local Backend")
+app = FastAPI(title="DeepSeek HUD Agent - Local Backend", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -33,6 +47,39 @@ OLLAMA_BASE_URL = "http://127.0.0.1:11434/api"
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID", "")
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
+OLLAMA_KEEP_ALIVE = int(os.getenv("OLLAMA_KEEP_ALIVE", "600"))  # Seconds Ollama keeps the model loaded after a request
+OLLAMA_KEEP_WARM_INTERVAL = int(os.getenv("OLLAMA_KEEP_WARM_INTERVAL", "240"))  # Seconds between keep-warm pings
+OLLAMA_KEEP_WARM_IDLE = int(os.getenv("OLLAMA_KEEP_WARM_IDLE", "1800"))  # Stop keeping warm after this much idle time, 0 = never
+OLLAMA_COLD_LOAD_THRESHOLD = 0.5  # Seconds of Ollama load_duration that mark a request as a cold start
+
+def clamp_keep_warm_interval(interval: int, keep_alive: int) -> int:
+    """
+    Shorten the keep-warm interval so pings land before keep_alive expires.
+    
+    A ping can trail the last model use by up to two intervals (see keep_warm_scheduler),
+    so keep_alive has to outlast that or the model unloads between pings. A keep_alive of
+    0 or less means Ollama unloads immediately or never, so there is nothing to clamp.
+    """
+    if keep_alive > 0 and interval * 2 >= keep_alive:
+        clamped = max(1, keep_alive // 3)
+        print(
+            f"Warning: OLLAMA_KEEP_WARM_INTERVAL={interval}s is too long for "
+            f"OLLAMA_KEEP_ALIVE={keep_alive}s; using {clamped}s"
+        )
+        return clamped
+    return interval
+
+OLLAMA_KEEP_WARM_INTERVAL = clamp_keep_warm_interval(OLLAMA_KEEP_WARM_INTERVAL, OLLAMA_KEEP_ALIVE)
+
+# Model residency and time-to-first-token tracking
+_model_stats = {
+    "warmup_seconds": None,
+    "warmup_error": None,
+    "last_chat_at": time.time(),
+    "last_model_use_at": 0.0,
+    "keep_warm_pings": 0,
+    "ttft": {"cold": deque(maxlen=100), "warm": deque(maxlen=100)},
+}
 
 # Chat message models
 class Message(BaseModel):
@@ -51,13 +98,87 @@ class WeatherRequest(BaseModel):
     latitude: float
     longitude: float
 
+async def prefill_model(attempts: int = 1):
+    """
+    Load MODEL_TAG into Ollama and prefill the system prompt shared by every chat.
+    
+    Args:
+        attempts: Number of tries, waiting between them while Ollama starts up
+        
+    Returns:
+        Ollama's load_duration for the request, in seconds
+    """
+    data = {
+        "model": MODEL_TAG,
+        "prompt": f"{PERSONALITY_SYSTEM_PROMPT}\n\n",
+        "stream": False,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": {"num_predict": 1}
+    }
+    
+    for attempt in range(attempts):
+        try:
+            async with httpx.AsyncClient() as client:
+                resp = await client.post(f"{OLLAMA_BASE_URL}/generate", json=data, timeout=300.0)
+                resp.raise_for_status()
+            _model_stats["last_model_use_at"] = time.time()
+            return resp.json().get("load_duration", 0) / 1e9
+        except httpx.HTTPError:
+            if attempt == attempts - 1:
+                raise
+            await asyncio.sleep(min(2 ** attempt, 30))
+
+async def keep_warm_scheduler():
+    """Warm the model, then ping Ollama so it stays loaded while chats keep arriving."""
+    started = time.perf_counter()
+    try:
+        await prefill_model(attempts=8)
+        _model_stats["warmup_seconds"] = round(time.perf_counter() - started, 3)
+    except httpx.HTTPError as e:
+        _model_stats["warmup_error"] = str(e)
+        print(f"Model warmup failed: {e}")
+    
+    while True:
+        await asyncio.sleep(OLLAMA_KEEP_WARM_INTERVAL)
+        now = time.time()
+        
+        # Let Ollama unload the model once traffic has stopped
+        if OLLAMA_KEEP_WARM_IDLE and now - _model_stats["last_chat_at"] > OLLAMA_KEEP_WARM_IDLE:
+            continue
+        # A recent request already refreshed keep_alive; skipping can delay the next ping to
+        # two intervals after it, which the clamp on OLLAMA_KEEP_WARM_INTERVAL accounts for
+        if now - _model_stats["last_model_use_at"] < OLLAMA_KEEP_WARM_INTERVAL:
+            continue
+        
+        try:
+            await prefill_model()
+            _model_stats["keep_warm_pings"] += 1
+        except httpx.HTTPError as e:
+            print(f"Keep-warm ping failed: {e}")
+
+def _summarize_ttft(samples) -> Optional[Dict[str, Any]]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "avg": round(sum(ordered) / len(ordered), 3),
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "max": round(ordered[-1], 3)
+    }
+
 async def stream_ollama_response(prompt: str):
     """Stream response from Ollama API."""
+    started = time.perf_counter()
+    ttft = None
+    _model_stats["last_chat_at"] = time.time()
+    
     async with httpx.AsyncClient() as client:
         data = {
             "model": MODEL_TAG,
             "prompt": prompt,
-            "stream": True
+            "stream": True,
+            "keep_alive": OLLAMA_KEEP_ALIVE
         }
         
         async with client.stream("POST", f"{OLLAMA_BASE_URL}/generate", json=data, timeout=60.0) as response:
@@ -72,10 +193,16 @@ async def stream_ollama_response(prompt: str):
                 try:
                     chunk = json.loads(line)
                     if "response" in chunk:
+                        if ttft is None:
+                            ttft = time.perf_counter() - started
                         yield f"data: {json.dumps({'text': chunk['response']})}\n\n"
                     
                     # Check if this is the final response
                     if chunk.get("done", False):
+                        _model_stats["last_model_use_at"] = time.time()
+                        if ttft is not None:
+                            cold = chunk.get("load_duration", 0) / 1e9 > OLLAMA_COLD_LOAD_THRESHOLD
+                            _model_stats["ttft"]["cold" if cold else "warm"].append(ttft)
                         yield f"data: [DONE]\n\n"
                         break
                 except json.JSONDecodeError:
@@ -114,17 +241,68 @@ async def speak(request: SpeakRequest):
     )
 
 @app.post("/transcribe")
-async def transcribe(request: Request):
-    """Transcribe audio using Whisper."""
-    # This is a placeholder for the Whisper implementation
-    # In a real implementation, you would:
-    # 1. Read the audio data from the request
-    # 2. Save it to a temporary file
-    # 3. Run Whisper on it
-    # 4. Return the transcription
+async def transcribe(request: Request, sample_rate: Optional[int] = None):
+    """Transcribe streamed audio, sending partial transcripts when the client accepts text/event-stream."""
+    try:
+        events = transcribe_stream(request.stream(), request.headers.get("content-type", ""), sample_rate)
+    except TranscriptionUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    
+    if "text/event-stream" in request.headers.get("accept", ""):
+        return UploadStreamingResponse(
+            transcription_events(events),
+            media_type="text/event-stream"
+        )
     
-    # For now, return a mock response
-    return {"text": "This is a placeholder for the transcription service."}
+    # Plain clients only get the final transcript
+    try:
+        async for event in events:
+            pass
+    except TranscriptionUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"text": event["text"], "metrics": event["metrics"]}
+
+@app.get("/transcribe/stats")
+async def transcribe_stats():
+    """Report real-time factor and queue latency of the transcription pipeline."""
+    return get_asr_stats()
+
+@app.get("/health")
+async def health():
+    """Liveness check; the server is accepting requests."""
+    return {"status": "ok"}
+
+@app.get("/ready")
+async def ready():
+    """Readiness check; 503 until the model is loaded and while transcription workers are still loading."""
+    model_loaded = _model_stats["last_model_use_at"] > 0
+    asr = asr_status()
+    # A broken transcription engine only fails /transcribe, so it is reported but does not block traffic
+    is_ready = model_loaded and not asr["pending"]
+    return JSONResponse(
+        {"ready": is_ready, "components": {"model": model_loaded, "asr": asr}},
+        status_code=200 if is_ready else 503
+    )
+
+@app.get("/model/stats")
+async def model_stats():
+    """Report warmup, keep-warm activity and cold versus warm time to first token."""
+    return {
+        "model": MODEL_TAG,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "keep_warm_interval": OLLAMA_KEEP_WARM_INTERVAL,
+        "keep_warm_idle": OLLAMA_KEEP_WARM_IDLE,
+        "warmup_seconds": _model_stats["warmup_seconds"],
+        "warmup_error": _model_stats["warmup_error"],
+        "keep_warm_pings": _model_stats["keep_warm_pings"],
+        "idle_seconds": round(time.time() - _model_stats["last_chat_at"], 1),
+        "ttft_cold": _summarize_ttft(_model_stats["ttft"]["cold"]),
+        "ttft_warm": _summarize_ttft(_model_stats["ttft"]["warm"])
+    }
 
 @app.post("/rag/upload")
 async def upload_document(request: Request):
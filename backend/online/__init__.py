@@ -0,0 +1 @@
+# F.R.I.D.A.Y online backend (DeepSeek API)
@@ -1,20 +1,31 @@
 from fastapi import FastAPI, Request, Response, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse
 import httpx
 import os
 import json
-import sys
 import asyncio
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 
-# Add common directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from common.tts import text_to_speech
 from common.rag import get_rag_context
+from common.responses import UploadStreamingResponse
+from common.asr import (
+    TranscriptionUnavailable, transcribe_stream, transcription_events, get_asr_stats, preload_asr, asr_status, shutdown_asr
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the transcription workers in the background while serving requests."""
+    preload = asyncio.create_task(preload_asr())
+    yield
+    preload.cancel()
+    await asyncio.gather(preload, return_exceptions=True)
+    shutdown_asr()
 
-app = FastAPI(title="F.R.I.D.A.Y - Online Backend")
+app = FastAPI(title="F.R.I.D.A.Y - Online Backend", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -155,17 +166,51 @@ async def list_voices():
         return response.json()
 
 @app.post("/transcribe")
-async def transcribe(request: Request):
-    """Transcribe audio using Whisper."""
-    # This is a placeholder for the Whisper implementation
-    # In a real implementation, you would:
-    # 1. Read the audio data from the request
-    # 2. Save it to a temporary file
-    # 3. Run Whisper on it
-    # 4. Return the transcription
+async def transcribe(request: Request, sample_rate: Optional[int] = None):
+    """Transcribe streamed audio, sending partial transcripts when the client accepts text/event-stream."""
+    try:
+        events = transcribe_stream(request.stream(), request.headers.get("content-type", ""), sample_rate)
+    except TranscriptionUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=str(e))
     
-    # For now, return a mock response
-    return {"text": "This is a placeholder for the transcription service."}
+    if "text/event-stream" in request.headers.get("accept", ""):
+        return UploadStreamingResponse(
+            transcription_events(events),
+            media_type="text/event-stream"
+        )
+    
+    # Plain clients only get the final transcript
+    try:
+        async for event in events:
+            pass
+    except TranscriptionUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"text": event["text"], "metrics": event["metrics"]}
+
+@app.get("/transcribe/stats")
+async def transcribe_stats():
+    """Report real-time factor and queue latency of the transcription pipeline."""
+    return get_asr_stats()
+
+@app.get("/health")
+async def health():
+    """Liveness check; the server is accepting requests."""
+    return {"status": "ok"}
+
+@app.get("/ready")
+async def ready():
+    """Readiness check; 503 while transcription workers are still loading."""
+    asr = asr_status()
+    # A broken transcription engine only fails /transcribe, so it is reported but does not block traffic
+    is_ready = not asr["pending"]
+    return JSONResponse(
+        {"ready": is_ready, "components": {"asr": asr}},
+        status_code=200 if is_ready else 503
+    )
 
 @app.post("/rag/upload")
 async def upload_document(request: Request):
@@ -0,0 +1,13 @@
+import pytest
+
+from common import asr
+
+
+@pytest.fixture
+def stub_asr(monkeypatch):
+    """Deterministic stub engine with 1 s windows and a fresh worker pool."""
+    monkeypatch.setattr(asr, "ASR_ENGINE", "stub")
+    monkeypatch.setattr(asr, "ASR_WINDOW_SECONDS", 1.0)
+    asr.shutdown_asr()
+    yield
+    asr.shutdown_asr()
@@ -0,0 +1,67 @@
+import time
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from common import asr
+from local import main as local_main
+from online import main as online_main
+
+
+@pytest.mark.parametrize("app", [local_main.app, online_main.app], ids=["local", "online"])
+def test_health(app):
+    response = TestClient(app).get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_ready_when_transcription_is_disabled(stub_asr, monkeypatch):
+    monkeypatch.setattr(asr, "ASR_ENGINE", "")
+
+    response = TestClient(online_main.app).get("/ready")
+    assert response.status_code == 200
+    assert response.json()["components"]["asr"]["state"] == "disabled"
+
+
+def test_not_ready_while_transcription_is_loading(stub_asr):
+    client = TestClient(online_main.app)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["components"]["asr"]["state"] == "loading"
+
+    asyncio.run(asr.preload_asr())
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["components"]["asr"] == {"state": "ready", "error": None, "pending": False}
+
+
+def test_failed_transcription_engine_does_not_block_readiness(stub_asr, monkeypatch):
+    monkeypatch.setattr(asr, "ASR_ENGINE", "tests.test_readiness:MissingEngine")
+    asyncio.run(asr.preload_asr())
+    client = TestClient(online_main.app)
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    component = response.json()["components"]["asr"]
+    assert component["state"] == "failed"
+    assert "MissingEngine" in component["error"]
+
+    # The failure surfaces where it matters instead
+    assert client.post("/transcribe", content=b"\0\0", headers={"content-type": "audio/l16"}).status_code == 503
+
+
+def test_local_ready_waits_for_the_model(stub_asr, monkeypatch):
+    monkeypatch.setattr(asr, "ASR_ENGINE", "")
+    client = TestClient(local_main.app)
+
+    monkeypatch.setitem(local_main._model_stats, "last_model_use_at", 0.0)
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["components"]["model"] is False
+
+    monkeypatch.setitem(local_main._model_stats, "last_model_use_at", time.time())
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
@@ -0,0 +1,203 @@
+import os
+import json
+import math
+import signal
+import struct
+import asyncio
+
+import pytest
+
+from common import asr
+from local.main import app as local_app
+from online.main import app as online_app
+
+SAMPLE_RATE = 16000
+
+
+def pcm_tone(seconds: float) -> bytes:
+    """16-bit mono PCM loud enough for the stub engine to report speech."""
+    return b"".join(
+        struct.pack("<h", int(8000 * math.sin(i / 10))) for i in range(int(seconds * SAMPLE_RATE))
+    )
+
+
+async def post_chunked(app, path: str, chunks, headers, delay: float = 0.05):
+    """
+    Drive an ASGI app with a chunked request body, the way uvicorn delivers it.
+
+    Returns:
+        (status, response body, number of body chunks still unread when the first event was sent)
+    """
+    pending = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks]
+    pending.append({"type": "http.request", "body": b"", "more_body": False})
+    response_done = asyncio.Event()
+    status = None
+    body = b""
+    unread_at_first_event = None
+
+    async def receive():
+        if pending:
+            await asyncio.sleep(delay)
+        if pending:
+            return pending.pop(0)
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, body, unread_at_first_event
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            if message.get("body", b"").startswith(b"data: {") and unread_at_first_event is None:
+                unread_at_first_event = len(pending)
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                response_done.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    await asyncio.wait_for(app(scope, receive, send), timeout=20)
+    return status, body, unread_at_first_event
+
+
+def parse_events(body: bytes):
+    events = []
+    for block in body.decode().split("\n\n"):
+        if block.startswith("data: ") and block != "data: [DONE]":
+            events.append(json.loads(block[len("data: "):]))
+    return events
+
+
+class CrashingEngine:
+    """Engine whose workers die while loading, like whisper without its packages."""
+
+    def __init__(self, model: str):
+        import os
+        os._exit(1)
+
+
+@pytest.mark.parametrize("app", [local_app, online_app], ids=["local", "online"])
+def test_chunked_upload_streams_partial_transcripts(stub_asr, app):
+    audio = pcm_tone(4)
+    # 0.5 s of audio per chunk, so each 1 s window completes after two chunks
+    chunk_bytes = SAMPLE_RATE
+    chunks = [audio[i:i + chunk_bytes] for i in range(0, len(audio), chunk_bytes)]
+
+    async def run():
+        await asr.preload_asr()
+        return await post_chunked(
+            app,
+            "/transcribe",
+            chunks,
+            {"content-type": "audio/l16; rate=16000", "accept": "text/event-stream"},
+        )
+
+    status, body, unread_at_first_event = asyncio.run(run())
+    events = parse_events(body)
+
+    assert status == 200
+    partials = [event for event in events if event["partial"]]
+    final = events[-1]
+    assert len(partials) == 4
+    assert [p["end"] for p in partials] == [1.0, 2.0, 3.0, 4.0]
+    assert final["partial"] is False
+    assert final["metrics"]["windows"] == 4
+    assert final["text"] == " ".join(["[speech 1.00s]"] * 4)
+    # The first partial went out while the upload was still in progress
+    assert unread_at_first_event > 0
+
+
+def test_crashed_workers_report_an_error_and_recover(stub_asr, monkeypatch):
+    chunks = [pcm_tone(1)]
+    headers = {"content-type": "audio/l16; rate=16000"}
+    monkeypatch.setattr(asr, "ASR_ENGINE", "tests.test_transcribe:CrashingEngine")
+
+    status, body, _ = asyncio.run(post_chunked(online_app, "/transcribe", chunks, headers, delay=0))
+    assert status == 503
+    assert "crashed" in json.loads(body)["detail"]
+    assert not asr.asr_ready()
+
+    status, body, _ = asyncio.run(post_chunked(
+        online_app, "/transcribe", chunks, dict(headers, accept="text/event-stream"), delay=0
+    ))
+    assert status == 200
+    assert "crashed" in parse_events(body)[-1]["error"]
+
+    # The broken pool is dropped, so fixing the engine is enough for the next request
+    monkeypatch.setattr(asr, "ASR_ENGINE", "stub")
+    status, body, _ = asyncio.run(post_chunked(online_app, "/transcribe", chunks, headers, delay=0))
+    assert status == 200
+    assert json.loads(body)["text"] == "[speech 1.00s]"
+    assert asr.asr_ready()
+
+
+def test_killed_workers_are_replaced_and_ready_again(stub_asr):
+    chunks = [pcm_tone(1)]
+    headers = {"content-type": "audio/l16; rate=16000"}
+    asyncio.run(asr.preload_asr())
+    assert asr.asr_ready()
+
+    for pid in list(asr._executor._processes):
+        os.kill(pid, signal.SIGKILL)
+
+    status, _, _ = asyncio.run(post_chunked(online_app, "/transcribe", chunks, headers, delay=0))
+    assert status == 503
+    assert not asr.asr_ready()
+
+    status, body, _ = asyncio.run(post_chunked(online_app, "/transcribe", chunks, headers, delay=0))
+    assert status == 200
+    assert json.loads(body)["text"] == "[speech 1.00s]"
+    assert asr.asr_ready()
+
+
+@pytest.mark.parametrize("engine, detail", [
+    ("", "not configured"),
+    ("tests.test_transcribe:MissingEngine", "MissingEngine"),
+], ids=["unset", "unknown"])
+def test_unusable_engine_is_rejected_before_reading_audio(stub_asr, monkeypatch, engine, detail):
+    monkeypatch.setattr(asr, "ASR_ENGINE", engine)
+
+    status, body, _ = asyncio.run(post_chunked(
+        online_app, "/transcribe", [pcm_tone(1)], {"content-type": "audio/l16"}, delay=0
+    ))
+    assert status == 503
+    assert detail in json.loads(body)["detail"]
+
+
+@pytest.fixture
+def failing_ffmpeg(tmp_path, monkeypatch):
+    """An ffmpeg on PATH that rejects any input straight away."""
+    shim = tmp_path / "ffmpeg"
+    shim.write_text("#!/bin/sh\nexit 1\n")
+    shim.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+
+@pytest.mark.parametrize("accept", ["application/json", "text/event-stream"])
+def test_rejected_compressed_audio_is_a_decode_error(stub_asr, failing_ffmpeg, accept):
+    # Far more than a pipe buffer, so writes hit the closed pipe after ffmpeg exits
+    chunks = [b"\x1aE\xdf\xa3" + b"\0" * 65532] * 32
+
+    status, body, _ = asyncio.run(post_chunked(
+        online_app, "/transcribe", chunks, {"content-type": "audio/webm", "accept": accept}, delay=0
+    ))
+
+    if accept == "text/event-stream":
+        assert status == 200
+        assert parse_events(body)[-1] == {"error": "Failed to decode audio"}
+        assert body.endswith(b"data: [DONE]\n\n")
+    else:
+        assert status == 400
+        assert json.loads(body)["detail"] == "Failed to decode audio"
@@ -0,0 +1,147 @@
+import json
+import asyncio
+from collections import deque
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from local import main as local_main
+
+START = 1000.0
+
+
+class StopScheduler(Exception):
+    pass
+
+
+@pytest.fixture
+def model_stats(monkeypatch):
+    """Fresh model stats, as if the server started at START."""
+    stats = local_main._model_stats
+    monkeypatch.setitem(stats, "warmup_seconds", None)
+    monkeypatch.setitem(stats, "warmup_error", None)
+    monkeypatch.setitem(stats, "last_chat_at", START)
+    monkeypatch.setitem(stats, "last_model_use_at", 0.0)
+    monkeypatch.setitem(stats, "keep_warm_pings", 0)
+    monkeypatch.setitem(stats, "ttft", {"cold": deque(maxlen=100), "warm": deque(maxlen=100)})
+    return stats
+
+
+def run_scheduler(monkeypatch, ticks, interval=100, idle=1000, on_tick=None, warmup_error=None):
+    """
+    Run keep_warm_scheduler against a fake clock for a number of sleep intervals.
+
+    Returns:
+        Clock times at which prefill_model was called, the startup warmup included
+    """
+    clock = {"now": START, "ticks": 0}
+    pings = []
+
+    async def fake_prefill(attempts: int = 1):
+        pings.append(clock["now"])
+        if warmup_error and attempts > 1:
+            raise warmup_error
+        local_main._model_stats["last_model_use_at"] = clock["now"]
+        return 0.0
+
+    async def fake_sleep(seconds):
+        if clock["ticks"] == ticks:
+            raise StopScheduler
+        clock["ticks"] += 1
+        clock["now"] += seconds
+        if on_tick:
+            on_tick(clock["now"])
+
+    monkeypatch.setattr(local_main, "OLLAMA_KEEP_WARM_INTERVAL", interval)
+    monkeypatch.setattr(local_main, "OLLAMA_KEEP_WARM_IDLE", idle)
+    monkeypatch.setattr(local_main, "prefill_model", fake_prefill)
+    monkeypatch.setattr(local_main.time, "time", lambda: clock["now"])
+    monkeypatch.setattr(local_main.asyncio, "sleep", fake_sleep)
+
+    with pytest.raises(StopScheduler):
+        asyncio.run(local_main.keep_warm_scheduler())
+    return pings
+
+
+def test_pings_every_interval_until_traffic_goes_idle(model_stats, monkeypatch):
+    pings = run_scheduler(monkeypatch, ticks=15, interval=100, idle=1000)
+
+    # Startup warmup, then pings until the last chat is more than 1000 s old
+    assert pings == [START + 100 * i for i in range(11)]
+    assert model_stats["keep_warm_pings"] == 10
+    assert model_stats["warmup_seconds"] is not None
+
+
+def test_idle_cutoff_of_zero_keeps_warm_forever(model_stats, monkeypatch):
+    pings = run_scheduler(monkeypatch, ticks=30, interval=100, idle=0)
+
+    assert len(pings) == 31
+
+
+def test_skips_ping_when_a_request_just_used_the_model(model_stats, monkeypatch):
+    def chat_before_second_tick(now):
+        if now == START + 200:
+            model_stats["last_chat_at"] = model_stats["last_model_use_at"] = START + 150
+
+    pings = run_scheduler(monkeypatch, ticks=4, interval=100, on_tick=chat_before_second_tick)
+
+    assert pings == [START, START + 100, START + 300, START + 400]
+    # Even after a skip the next ping trails the last model use by less than two intervals
+    assert pings[2] - (START + 150) < 2 * 100
+
+
+def test_failed_warmup_is_reported_and_pings_continue(model_stats, monkeypatch):
+    pings = run_scheduler(monkeypatch, ticks=2, warmup_error=httpx.ConnectError("connection refused"))
+
+    assert model_stats["warmup_error"] == "connection refused"
+    assert model_stats["warmup_seconds"] is None
+    assert pings == [START, START + 100, START + 200]
+
+
+@pytest.mark.parametrize("interval, keep_alive, expected", [
+    (240, 600, 240),
+    (300, 600, 200),
+    (300, 300, 100),
+    (900, 600, 200),
+    (240, 0, 240),
+    (240, -1, 240),
+], ids=["fits", "exactly-half", "equal", "longer", "unload-now", "never-unload"])
+def test_clamp_keep_warm_interval(interval, keep_alive, expected, capsys):
+    assert local_main.clamp_keep_warm_interval(interval, keep_alive) == expected
+    assert ("Warning" in capsys.readouterr().out) == (expected != interval)
+
+
+@pytest.mark.parametrize("load_duration, bucket", [
+    (3_000_000_000, "ttft_cold"),
+    (2_000_000, "ttft_warm"),
+], ids=["cold", "warm"])
+def test_ttft_is_classified_by_ollama_load_duration(model_stats, monkeypatch, load_duration, bucket):
+    requests = []
+
+    def ollama(request: httpx.Request):
+        requests.append(json.loads(request.content))
+        chunks = [
+            {"response": "Hel", "done": False},
+            {"response": "lo", "done": False},
+            {"response": "", "done": True, "load_duration": load_duration},
+        ]
+        return httpx.Response(200, content="\n".join(json.dumps(chunk) for chunk in chunks).encode())
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        local_main.httpx, "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(ollama))
+    )
+    client = TestClient(local_main.app)
+
+    response = client.post("/chat", json={"message": "hi"})
+    assert response.status_code == 200
+    assert 'data: {"text": "Hel"}' in response.text
+    assert response.text.endswith("data: [DONE]\n\n")
+    assert requests[0]["keep_alive"] == local_main.OLLAMA_KEEP_ALIVE
+
+    stats = client.get("/model/stats").json()
+    other = "ttft_warm" if bucket == "ttft_cold" else "ttft_cold"
+    assert stats[bucket]["count"] == 1
+    assert stats[other] is None
@@ -33,18 +33,22 @@ export default function MicButton() {
         setIsProcessing(true);
         
         // Create audio blob from chunks
-        const audioBlob = new Blob(audioChunksRef.current, { type: 'audio/wav' });
+        const audioBlob = new Blob(audioChunksRef.current, { type: mediaRecorder.mimeType || 'audio/webm' });
         
-        // Send to transcription API
+        // Send the raw audio to the transcription API so the backend can decode it as it arrives
         try {
-          const formData = new FormData();
-          formData.append('audio', audioBlob);
-          
           const response = await fetch(TRANSCRIBE_ENDPOINT, {
             method: 'POST',
-            body: formData,
+            headers: { 'Content-Type': audioBlob.type },
+            body: audioBlob,
           });
           
+          if (response.status === 503) {
+            // No ASR engine configured on the backend; don't turn the recording into a message
+            console.warn('Transcription unavailable:', (await response.json()).detail);
+            return;
+          }
+          
           if (!response.ok) {
             throw new Error(`Transcription failed: ${response.status}`);
           }
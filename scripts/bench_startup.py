@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold-start import time of the backends and the RAG indexer.
+
+Each target is imported in a fresh interpreter with -X importtime, so the
+numbers match what a new container pays before it can serve a request.
+Save a run with --save and compare later runs against it with --compare
+to spot startup regressions.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BACKEND_DIR = ROOT / "backend"
+
+# name -> (working directory, interpreter arguments after -X importtime)
+TARGETS = {
+    "common.asr": (BACKEND_DIR, ["-c", "import common.asr"]),
+    "common.rag": (BACKEND_DIR, ["-c", "import common.rag"]),
+    "common.tts": (BACKEND_DIR, ["-c", "import common.tts"]),
+    "local.main": (BACKEND_DIR, ["-c", "import local.main"]),
+    "online.main": (BACKEND_DIR, ["-c", "import online.main"]),
+    "index_docs --help": (ROOT, [str(ROOT / "scripts" / "index_docs.py"), "--help"]),
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark backend and indexer import time")
+    parser.add_argument("targets", nargs="*", default=list(TARGETS),
+                      help=f"Targets to measure (default: all of {', '.join(TARGETS)})")
+    parser.add_argument("--runs", type=int, default=5,
+                      help="Fresh interpreter runs per target; the median is reported")
+    parser.add_argument("--top", type=int, default=5,
+                      help="Number of slowest modules (median self time) to show per target")
+    parser.add_argument("--save", type=str,
+                      help="Write results to this JSON file")
+    parser.add_argument("--compare", type=str,
+                      help="Compare against results saved with --save")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                      help="Fail if import time grows by more than this fraction over --compare")
+    return parser.parse_args()
+
+def parse_importtime(stderr: str):
+    """
+    Parse -X importtime output.
+    
+    Returns:
+        (total import microseconds, {module: self microseconds})
+    """
+    total = 0
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented below the module that triggered them
+        if name[1:2] != " ":
+            total += int(cumulative)
+        modules[name.strip()] = modules.get(name.strip(), 0) + int(self_us)
+    return total, modules
+
+def measure(name: str, runs: int):
+    cwd, args = TARGETS[name]
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    walls, imports, module_runs = [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=cwd, env=env, capture_output=True, text=True
+        )
+        walls.append(time.perf_counter() - started)
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode
+            return {"error": str(error)}
+        total, modules = parse_importtime(proc.stderr)
+        imports.append(total)
+        module_runs.append(modules)
+
+    # Median per module too, so the breakdown is as stable as the headline numbers
+    names = set().union(*module_runs)
+    modules = {name: statistics.median(run.get(name, 0) for run in module_runs) for name in names}
+    return {
+        "wall_ms": round(statistics.median(walls) * 1000, 1),
+        "import_ms": round(statistics.median(imports) / 1000, 1),
+        "slowest": sorted(modules.items(), key=lambda item: item[1], reverse=True),
+    }
+
+def main():
+    args = parse_args()
+    unknown = [name for name in args.targets if name not in TARGETS]
+    if unknown:
+        sys.exit(f"Unknown targets: {', '.join(unknown)}")
+
+    baseline = {}
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+
+    results = {}
+    regressions = []
+    failures = []
+    print(f"{'target':<20} {'wall ms':>9} {'import ms':>10} {'vs base':>8}")
+    for name in args.targets:
+        result = measure(name, args.runs)
+        if "error" in result:
+            # Saved too, so a later --compare sees the target was broken rather than missing
+            results[name] = {"error": result["error"]}
+            failures.append(name)
+            print(f"{name:<20} failed: {result['error']}")
+            continue
+        results[name] = {"wall_ms": result["wall_ms"], "import_ms": result["import_ms"]}
+
+        delta = ""
+        base = baseline.get(name)
+        if args.compare and base is None:
+            delta = "new"
+        elif base and "error" in base:
+            delta = "fixed"
+        elif base and base["import_ms"]:
+            change = result["import_ms"] / base["import_ms"] - 1
+            delta = f"{change:+.0%}"
+            if change > args.max_regression:
+                regressions.append(name)
+        print(f"{name:<20} {result['wall_ms']:>9.1f} {result['import_ms']:>10.1f} {delta:>8}")
+        for module, self_us in result["slowest"][:args.top]:
+            print(f"    {module:<32} {self_us / 1000:>8.1f} ms")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2) + "\n")
+
+    if regressions:
+        print(f"Import time regressed by more than {args.max_regression:.0%}: {', '.join(regressions)}")
+    if args.compare and failures:
+        print(f"Targets failed to import: {', '.join(failures)}")
+    if regressions or (args.compare and failures):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
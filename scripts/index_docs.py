@@ -13,21 +13,29 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Try to import required packages, install if missing
-try:
-    import chromadb
-    from langchain.document_loaders import DirectoryLoader, TextLoader, PDFLoader
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    from langchain.embeddings import HuggingFaceEmbeddings
-    from langchain.vectorstores import Chroma
-except ImportError:
-    logger.info("Installing required packages...")
-    os.system("pip install chromadb langchain langchain-community sentence-transformers pypdf")
-    import chromadb
-    from langchain.document_loaders import DirectoryLoader, TextLoader, PDFLoader
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    from langchain.embeddings import HuggingFaceEmbeddings
-    from langchain.vectorstores import Chroma
+REQUIRED_PACKAGES = "chromadb langchain langchain-community sentence-transformers pypdf"
+
+def import_langchain():
+    """Import the document loaders, deferred so --help and empty runs start instantly."""
+    try:
+        from langchain.document_loaders import DirectoryLoader, TextLoader, PyPDFLoader
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+    except ImportError as e:
+        logger.error(f"Missing dependency: {e}")
+        logger.info(f"Install the indexing dependencies with: pip install {REQUIRED_PACKAGES}")
+        sys.exit(1)
+    return DirectoryLoader, TextLoader, PyPDFLoader, RecursiveCharacterTextSplitter
+
+def import_vectorstore():
+    """Import the embedding model and vector store clients, only needed once documents are split."""
+    try:
+        from langchain.embeddings import HuggingFaceEmbeddings
+        from langchain.vectorstores import Chroma
+    except ImportError as e:
+        logger.error(f"Missing dependency: {e}")
+        logger.info(f"Install the indexing dependencies with: pip install {REQUIRED_PACKAGES}")
+        sys.exit(1)
+    return HuggingFaceEmbeddings, Chroma
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Index documents for RAG")
@@ -57,11 +65,22 @@ def main():
     
     logger.info(f"Indexing documents from {docs_path}")
     
+    has_text = next(docs_path.glob("**/*.txt"), None) is not None
+    has_pdf = next(docs_path.glob("**/*.pdf"), None) is not None
+    
+    # Check if we have any documents to load
+    if not has_text and not has_pdf:
+        logger.warning(f"No supported documents found in {docs_path}")
+        logger.info(f"Please add .txt or .pdf files to {docs_path}")
+        return
+    
+    DirectoryLoader, TextLoader, PyPDFLoader, RecursiveCharacterTextSplitter = import_langchain()
+    
     # Load documents
     loaders = []
     
     # Text files
-    if list(docs_path.glob("**/*.txt")):
+    if has_text:
         text_loader = DirectoryLoader(
             str(docs_path),
             glob="**/*.txt",
@@ -70,20 +89,14 @@ def main():
         loaders.append(text_loader)
     
     # PDF files
-    if list(docs_path.glob("**/*.pdf")):
+    if has_pdf:
         pdf_loader = DirectoryLoader(
             str(docs_path),
             glob="**/*.pdf",
-            loader_cls=PDFLoader
+            loader_cls=PyPDFLoader
         )
         loaders.append(pdf_loader)
     
-    # Check if we have any documents to load
-    if not loaders:
-        logger.warning(f"No supported documents found in {docs_path}")
-        logger.info(f"Please add .txt or .pdf files to {docs_path}")
-        return
-    
     # Load all documents
     documents = []
     for loader in loaders:
@@ -102,6 +115,7 @@ def main():
     
     # Create embeddings
     logger.info("Loading embedding model (this might take a moment)...")
+    HuggingFaceEmbeddings, Chroma = import_vectorstore()
     embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
     
     # Create and persist vector store